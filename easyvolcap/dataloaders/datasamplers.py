@@ -1,6 +1,7 @@
 import torch
 import random
 import numpy as np
+from itertools import accumulate
 
 from typing import Iterator, Iterable, Optional, Sequence, List, TypeVar, Generic, Sized, Union
 from easyvolcap.engine import DATASAMPLERS
@@ -42,12 +43,13 @@ class ImageBasedBatchSampler(BatchSampler):
         super().__init__(sampler, batch_size, drop_last)
         self.n_srcs_list = n_srcs_list
         self.n_srcs_prob = n_srcs_prob
+        self._n_srcs_cum = list(accumulate(n_srcs_prob))  # avoid recomputing cumulative weights in `random.choices`
 
     def __iter__(self):
         # Use shared number of images for batching
         iterator = super().__iter__()
         for batch in iterator:
-            n_srcs = random.choices(self.n_srcs_list, self.n_srcs_prob)[0]
+            n_srcs = random.choices(self.n_srcs_list, cum_weights=self._n_srcs_cum, k=1)[0]
             batch = [dotdict(index=i, n_srcs=n_srcs) for i in batch]  # expand indices to dotdict
             yield batch
 
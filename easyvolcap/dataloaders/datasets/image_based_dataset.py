@@ -2,8 +2,12 @@ import cv2
 import torch
 import random
 import numpy as np
+from itertools import accumulate
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Union
+import torchvision
+from torchvision.io import decode_jpeg, ImageReadMode
 
 from easyvolcap.engine import DATASETS
 from easyvolcap.engine import cfg, args
@@ -12,11 +16,12 @@ from easyvolcap.dataloaders.datasets.volumetric_video_dataset import VolumetricV
 
 from easyvolcap.utils.console_utils import *
 from easyvolcap.utils.base_utils import dotdict
-from easyvolcap.utils.parallel_utils import parallel_execution
 from easyvolcap.utils.math_utils import affine_padding, affine_inverse
 from easyvolcap.utils.data_utils import DataSplit, pin_memory, to_tensor, as_torch_func
 from easyvolcap.utils.cam_utils import compute_camera_similarity, compute_camera_zigzag_similarity, Sourcing
 
+BATCHED_DECODE_JPEG = tuple(map(int, torchvision.__version__.split('+')[0].split('.')[:2])) >= (0, 19)  # list inputs for decode_jpeg
+
 
 # We have a tricky situation here:
 # There are datasets that stores all images in a single folder
@@ -42,8 +47,11 @@ class ImageBasedDataset(VolumetricVideoDataset):
                  closest_using_t: bool = False,  # find the closest view using the temporal dimension
                  source_type: str = Sourcing.DISTANCE.name,  # Sourcing.DISTANCE or Sourcing.ZIGZAG
                  supply_decoded: bool = False,
+                 decode_on_gpu: bool = False,  # decode source jpegs with nvjpeg, only usable with `num_workers=0` (no cuda in forked workers), disables `pin_memory`
                  barebone: bool = False,
                  skip_loading_images: bool = False,
+                 prefetch_target: bool = True,  # decode the target image alongside the source views
+                 src_image_cache_maxsize: int = 0,  # decoded source images shared across targets, 128 1080p images take ~3GB per worker
 
                  src_view_sample: List[int] = [0, None, 1],  # use these as input source views
                  force_sparse_view: bool = True,  # The user will be responsible for setting up the correct view count
@@ -60,28 +68,59 @@ class ImageBasedDataset(VolumetricVideoDataset):
         assert not self.closest_using_t or self.frame_sample == [0, None, 1] or force_sparse_view, "Should use default frame_sample [0, None, 1] for ibr dataset with `closest_using_t`. Control sampling through sampler.frame_sample and src_view_sample"
         assert self.view_sample == [0, None, 1] or force_sparse_view, "Should use default view_sample [0, None, 1] for ibr dataset. Control sampling through sampler.view_sample and src_view_sample"
         assert not (self.cache_raw and not supply_decoded), "Will always supply decoded source images when cache_raw is enabled for faster sampling, set cache_raw to False to supply jpeg streams"
+        assert not (decode_on_gpu and (self.cache_raw or self.use_depths or self.encode_ext != '.jpg')), "Can only decode jpeg streams on the gpu, set cache_raw and use_depths to False and encode_ext to .jpg"
         # if self.src_view_sample != [0, None, 1] and self.view_sample != [0, None, 1]: log(red(f'Using `src_view_sample = {self.src_view_sample}` when `view_sample = {self.view_sample}` is not default'))
         # if tar_view_sample != [0, None, 1] and view_sample != [0, None, 1]: log(red(f'Using `src_view_sample = {tar_view_sample}` when `view_sample = {self.view_sample}` is not default'))
         # self.tar_view_sample = tar_view_sample
 
         self.source_type = Sourcing[source_type]
+        self.n_srcs_list = n_srcs_list if len(n_srcs_list) != 1 or n_srcs_list[0] != 0 else [self.n_views]
+        self.n_srcs_prob = n_srcs_prob
+        self._n_srcs_cum = list(accumulate(n_srcs_prob))  # avoid recomputing cumulative weights in `random.choices`
+        self.extra_src_pool = extra_src_pool
+        self.append_gt_prob = append_gt_prob
+
         # Views are selected and loaded
         # Frames are selected and loaded
         self.load_source_params()
 
         # Need to build all possible view selections (distance of c2w)
         # - Dot product of v_front - euclidian distance of center
-        self.load_source_indices()
-
-        self.n_srcs_list = n_srcs_list if len(n_srcs_list) != 1 or n_srcs_list[0] != 0 else [self.n_views]
-        self.n_srcs_prob = n_srcs_prob
-        self.extra_src_pool = extra_src_pool
-        self.append_gt_prob = append_gt_prob
+        self.load_source_indices()  # depends on n_srcs_list and extra_src_pool
 
         # src_inps will come in as decoded bytes instead of jpegs
         self.supply_decoded = supply_decoded
+        self.decode_on_gpu = decode_on_gpu
         self.barebone = barebone
 
+        # Persistent thread pool for loading source views, one thread per possible source image
+        # Created lazily in every process, forked dataloader workers must not reuse the parent's threads
+        self._io_pool = None
+        self._io_pool_pid = None
+
+        # The same source image is loaded for every target that has it among its closest views
+        self.get_source_image = lru_cache(src_image_cache_maxsize)(self.get_image) if src_image_cache_maxsize else self.get_image
+
+        # Traced viewer source selection, keyed by the number of source views
+        self._viewer_fast = None
+
+        # The target image being decoded while the source views load, ((view_index, latent_index), future)
+        self.prefetch_target = prefetch_target
+        self._prefetched = None
+
+    @property
+    def io_pool(self):
+        if self._io_pool_pid != os.getpid():
+            self._io_pool = ThreadPoolExecutor(max_workers=max(max(self.n_srcs_list) + self.extra_src_pool, 1))
+            self._io_pool_pid = os.getpid()
+        return self._io_pool
+
+    def __getstate__(self):
+        # Thread pools and traced functions cannot be pickled (spawned dataloader workers), recreated on first use
+        state = VolumetricVideoDataset.__getstate__(self)
+        state['_io_pool'], state['_io_pool_pid'], state['_prefetched'], state['_viewer_fast'] = None, None, None, None
+        return state
+
     def load_source_params(self):
         # Perform view selection first
         view_inds = self.frame_inds if self.closest_using_t else self.view_inds
@@ -89,6 +128,7 @@ class ImageBasedDataset(VolumetricVideoDataset):
         if len(self.src_view_sample) != 3: view_inds = view_inds[self.src_view_sample]  # this is a list of indices
         else: view_inds = view_inds[self.src_view_sample[0]:self.src_view_sample[1]:self.src_view_sample[2]]  # begin, start, end
         self.src_view_inds = view_inds
+        self._src_view_inds = tuple(view_inds.tolist())  # for per-sample lookups without tensor machinery
         if len(view_inds) == 1: view_inds = [view_inds]  # MARK: pytorch indexing bug, when length is 1, will reduce a dim
 
         # Controls whether the interpolation is performed on the frame or view dim
@@ -98,30 +138,46 @@ class ImageBasedDataset(VolumetricVideoDataset):
         # For getting the actual data (renaming w2c and K)
         # See easyvolcap/dataloaders/datasets/image_based_inference_dataset
         if self.closest_using_t:  # this checks whether the view selection is performed on the frame or view dim
-            self.src_ixts = self.Ks[:, view_inds]  # N, L, 4, 4
-            self.src_exts = affine_padding(self.w2cs[:, view_inds])  # N, L, 4, 4
-            self.src_ixts = self.src_ixts.permute(1, 0, 2, 3)  # L, N, 4, 4 # MARK: transpose
-            self.src_exts = self.src_exts.permute(1, 0, 2, 3)  # L, N, 4, 4 # MARK: transpose
+            self.src_ixts = self.Ks[:, view_inds].permute(1, 0, 2, 3).contiguous()  # L, N, 3, 3 # MARK: transpose, stored in the final layout
+            src_w2cs = self.w2cs[:, view_inds].permute(1, 0, 2, 3)  # L, N, 3, 4 # MARK: transpose
         else:
-            self.src_ixts = self.Ks[view_inds]  # N, L, 4, 4
-            self.src_exts = affine_padding(self.w2cs[view_inds])  # N, L, 4, 4
+            self.src_ixts = self.Ks[view_inds]  # N, L, 3, 3
+            src_w2cs = self.w2cs[view_inds]  # N, L, 3, 4
+
+        # Fill the padded extrinsics in a single pass instead of padding then transposing
+        self.src_exts = src_w2cs.new_zeros(*src_w2cs.shape[:-2], 4, 4)  # N, L, 4, 4
+        self.src_exts[..., 3, 3] = 1
+        self.src_exts[..., :3, :4].copy_(src_w2cs)
+
+        # Pack intrinsics and extrinsics into a single latent-major buffer for the per-sample gather
+        self.src_cams = torch.cat([self.src_ixts.flatten(-2), self.src_exts.flatten(-2)], dim=-1).permute(1, 0, 2).contiguous()  # L, N, 9 + 16
+
+        # Static source camera centers, used for viewer source selection
+        self.src_c2w_centers = affine_inverse(self.src_exts)[..., :3, 3].contiguous()  # N, L, 3
+        self._viewer_fast = None  # traced on the previous source cameras, retrace on next use
 
     def load_source_indices(self):
         # Get the target views and source views
         tar_c2ws = self.c2ws.permute(1, 0, 2, 3) if self.closest_using_t else self.c2ws  # MARK: transpose
         src_c2ws = affine_inverse(self.src_exts)
 
+        # Only the closest `max(n_srcs_list) + extra_src_pool` views (and maybe the target itself) are ever sampled
+        top_k = max(self.n_srcs_list) + self.extra_src_pool + 1
+
         # Source view index and there similarity
         if self.source_type == Sourcing.DISTANCE:
-            self.src_sims, self.src_inds = compute_camera_similarity(tar_c2ws, src_c2ws)  # similarity to source views # Target, Source, Latent
+            _, src_inds = compute_camera_similarity(tar_c2ws, src_c2ws, top_k)  # similarity to source views # Target, K, Latent, on cpu: no cuda context before `set_device` or forking workers
         elif self.source_type == Sourcing.ZIGZAG:
-            self.src_sims, self.src_inds = compute_camera_zigzag_similarity(tar_c2ws, src_c2ws)  # similarity to source views # Target, Source, Latent
+            _, src_inds = compute_camera_zigzag_similarity(tar_c2ws, src_c2ws)  # similarity to source views # Target, Source, Latent
+            src_inds = src_inds[:, :top_k]  # Target, K, Latent
         else:
             raise NotImplementedError
+        assert len(self.src_view_inds) <= 32767, f'int16 source indices cannot address {len(self.src_view_inds)} source views'
+        self.src_inds = src_inds.to(torch.int16).cpu().numpy()  # T, K, L, compact gather table for per-sample source selection
 
     def get_metadata(self, index: dotdict):
         if isinstance(index, dotdict): index, n_srcs = index.index, index.n_srcs
-        else: n_srcs = random.choices(self.n_srcs_list, self.n_srcs_prob)[0]
+        else: n_srcs = random.choices(self.n_srcs_list, cum_weights=self._n_srcs_cum, k=1)[0]
 
         # Load target view related stuff
         output = VolumetricVideoDataset.get_metadata(self, index)  # target view camera matrices
@@ -139,25 +195,32 @@ class ImageBasedDataset(VolumetricVideoDataset):
             target_index = output.view_index
             extra_index = output.latent_index
 
+        # Start decoding the target image, `get_ground_truth` will pick it up after the source views are loaded
+        if self.split == DataSplit.TRAIN and self.prefetch_target:
+            self.prefetch_target_image(output.view_index, output.latent_index)
+
         # For training, maybe sample the original image
         remove_gt = 1 if random.random() > self.append_gt_prob else 0  # training and random -> exclude gt
         random_ap = self.extra_src_pool  # training -> randomly sample more
-        src_inds = self.src_inds[target_index, remove_gt:remove_gt + n_srcs + random_ap, extra_index]  # excluding the target view, 5 inds
-        if random_ap: src_inds = torch.as_tensor(random.sample(src_inds.numpy().tolist(), n_srcs))  # S (2, 4)
+        chosen = self.src_inds[target_index, remove_gt:remove_gt + n_srcs + random_ap, extra_index].tolist()  # excluding the target view, 5 inds, might be fewer
+        if random_ap:
+            assert len(chosen) >= n_srcs, f'Only {len(chosen)} source views available, but {n_srcs} requested'
+            chosen = random.sample(chosen, n_srcs)  # S (2, 4), python ints, positions in the source pool
 
         output.t_inds = extra_index
         output.meta.t_inds = extra_index
-        output.src_exts = self.src_exts[src_inds, extra_index]  # S, 4, 4
-        output.src_ixts = self.src_ixts[src_inds, extra_index]  # S, 3, 3
+        src_ixts, src_exts = self.src_cams[extra_index, chosen].split([9, 16], dim=-1)  # S, 9; S, 16
+        output.src_exts = src_exts.reshape(-1, 4, 4)  # S, 4, 4
+        output.src_ixts = src_ixts.reshape(-1, 3, 3)  # S, 3, 3
         output.meta.src_exts = output.src_exts
         output.meta.src_ixts = output.src_ixts
 
         # Other bookkeepings
-        src_inds = self.src_view_inds.gather(-1, src_inds)  # S, -> T, S, L -> T, S, L
+        source_index = [self._src_view_inds[i] for i in chosen]  # S, -> T, S, L -> T, S, L
+        src_inds = torch.tensor(source_index, dtype=torch.long)  # only promote to tensor once
         output.src_inds = src_inds  # as tensors
         output.meta.src_inds = src_inds  # as tensors
 
-        source_index = src_inds.detach().cpu().numpy().tolist()
         if self.closest_using_t:  # selecting closest view along temporal dimension # MARK: transpose
             latent_index = source_index
             view_index = extra_index
@@ -169,17 +232,43 @@ class ImageBasedDataset(VolumetricVideoDataset):
 
         return output
 
+    def prefetch_target_image(self, view_index: int, latent_index: int):
+        self._prefetched = (view_index, latent_index), self.io_pool.submit(self.get_image, view_index, latent_index)
+
+    def get_target_image(self, view_index: int, latent_index: int):
+        # Consume the prefetched target image, fall back to synchronous loading on a miss
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == (view_index, latent_index): return prefetched[1].result()
+        return self.get_image(view_index, latent_index)
+
     def get_sources(self, latent_index: Union[List[int], int], view_index: Union[List[int], int], output: dotdict):
-        if self.split == DataSplit.TRAIN or self.supply_decoded:  # most of the time we asynchronously load images for training, thus no need to decode them using nvjpeg
-            rgb, msk, wet, dpt, bkg, norm = zip(*parallel_execution(view_index, latent_index, action=self.get_image, sequential=True))
-            output.src_inps = [i.permute(2, 0, 1) for i in rgb]  # for data locality # S, H, W, 3 -> S, 3, H, W
-            if msk[0] is not None: output.src_msks = [i.permute(2, 0, 1) for i in msk]  # for data locality # S, H, W, 3 -> S, 3, H, W
-            if wet[0] is not None: output.src_wets = [i.permute(2, 0, 1) for i in wet]  # for data locality # S, H, W, 3 -> S, 3, H, W
-            if dpt[0] is not None: output.src_dpts = [i.permute(2, 0, 1) for i in dpt]  # for data locality # S, H, W, 3 -> S, 3, H, W
-            if bkg[0] is not None: output.src_bkgs = [i.permute(2, 0, 1) for i in bkg]  # for data locality # S, H, W, 3 -> S, 3, H, W
-            if norm[0] is not None: output.src_norms = [i.permute(2, 0, 1) for i in norm]  # for data locality # S, H, W, 3 -> S, 3, H, W
+        # Broadcast the shared index against the source indices, the pool maps them in order
+        n_srcs = len(view_index) if isinstance(view_index, list) else len(latent_index)
+        if not isinstance(view_index, list): view_index = [view_index] * n_srcs
+        if not isinstance(latent_index, list): latent_index = [latent_index] * n_srcs
+
+        # NOTE: `get_image` and `get_image_bytes` should release the GIL for the pool to scale (cv2.imdecode and torch ops do)
+        if self.decode_on_gpu:  # batched nvjpeg decoding, source images should share the same size
+            im_bytes, mk_bytes, wt_bytes, dp_bytes, bg_bytes, nm_bytes = zip(*self.io_pool.map(self.get_image_bytes, view_index, latent_index))
+            inps = self.decode_sources(im_bytes, ImageReadMode.RGB)  # S: 3, H, W
+            msks = self.decode_sources(mk_bytes, ImageReadMode.GRAY) if mk_bytes[0] is not None else [torch.ones_like(i[:1]) for i in inps]  # S: 1, H, W
+            wets = self.decode_sources(wt_bytes, ImageReadMode.GRAY) if wt_bytes[0] is not None else [m.clone() for m in msks]  # S: 1, H, W
+            wets = [w.masked_fill(m < self.bkgd_weight, self.bkgd_weight) for w, m in zip(wets, msks)]  # same as `get_image`
+            output.src_inps = self.batch_sources(inps)  # S, 3, H, W
+            output.src_msks = self.batch_sources(msks)  # S, 1, H, W
+            output.src_wets = self.batch_sources(wets)  # S, 1, H, W
+            if bg_bytes[0] is not None: output.src_bkgs = self.batch_sources(self.decode_sources(bg_bytes, ImageReadMode.RGB))  # S, 3, H, W
+            if nm_bytes[0] is not None: output.src_norms = self.batch_sources(self.decode_sources(nm_bytes, ImageReadMode.RGB))  # S, 3, H, W
+        elif self.split == DataSplit.TRAIN or self.supply_decoded:  # most of the time we asynchronously load images for training, thus no need to decode them using nvjpeg
+            rgb, msk, wet, dpt, bkg, norm = zip(*self.io_pool.map(self.get_source_image, view_index, latent_index))
+            output.src_inps = self.stack_sources(rgb)  # for data locality # S, H, W, 3 -> S, 3, H, W
+            if msk[0] is not None: output.src_msks = self.stack_sources(msk)  # for data locality # S, H, W, 3 -> S, 3, H, W
+            if wet[0] is not None: output.src_wets = self.stack_sources(wet)  # for data locality # S, H, W, 3 -> S, 3, H, W
+            if dpt[0] is not None: output.src_dpts = self.stack_sources(dpt)  # for data locality # S, H, W, 3 -> S, 3, H, W
+            if bkg[0] is not None: output.src_bkgs = self.stack_sources(bkg)  # for data locality # S, H, W, 3 -> S, 3, H, W
+            if norm[0] is not None: output.src_norms = self.stack_sources(norm)  # for data locality # S, H, W, 3 -> S, 3, H, W
         else:
-            im_bytes, mk_bytes, wt_bytes, dp_bytes, bg_bytes, nm_bytes = zip(*parallel_execution(view_index, latent_index, action=self.get_image_bytes, sequential=True))
+            im_bytes, mk_bytes, wt_bytes, dp_bytes, bg_bytes, nm_bytes = zip(*self.io_pool.map(self.get_image_bytes, view_index, latent_index))
             output.meta.src_inps = im_bytes
             if mk_bytes[0] is not None: output.meta.src_msks = mk_bytes
             if wt_bytes[0] is not None: output.meta.src_wets = wt_bytes
@@ -188,6 +277,41 @@ class ImageBasedDataset(VolumetricVideoDataset):
             if nm_bytes[0] is not None: output.meta.src_norms = nm_bytes
         return output
 
+    @staticmethod
+    def decode_sources(buffers: List[torch.Tensor], mode: ImageReadMode = ImageReadMode.RGB):
+        # decode_jpeg accepts a list of 1d uint8 cpu tensors and decodes them in one batch since torchvision 0.19
+        if BATCHED_DECODE_JPEG: imgs = decode_jpeg(list(buffers), device='cuda', mode=mode)
+        else: imgs = [decode_jpeg(buf, device='cuda', mode=mode) for buf in buffers]
+        return [img.float() / 255 for img in imgs]  # S: C, H, W, uint8(0,255) -> float32(0,1)
+
+    @staticmethod
+    def batch_sources(imgs: List[torch.Tensor]):
+        if any(i.shape != imgs[0].shape for i in imgs): return imgs  # differently sized source images
+        return torch.stack(imgs)  # S, C, H, W
+
+    def stack_sources(self, imgs: List[torch.Tensor]):
+        # Allocate the output contiguously in a single operation and copy the channel-first images into it concurrently
+        # The collated batch will be a single tensor, thus pinned and copied to the gpu in one go by the dataloader
+        if any(i.shape != imgs[0].shape for i in imgs): return [i.permute(2, 0, 1) for i in imgs]  # differently sized source images
+        H, W, C = imgs[0].shape
+        stacked = imgs[0].new_empty(len(imgs), C, H, W)  # S, C, H, W
+        list(self.io_pool.map(lambda dst, src: dst.copy_(src.permute(2, 0, 1)), stacked, imgs))  # disjoint slices
+        return stacked
+
+    def trace_viewer_sources(self, n_srcs: int):
+        src_c2w_centers, src_cams = self.src_c2w_centers, self.src_cams  # N, L, 3; L, N, 25, static, captured as constants
+        n_srcs = min(n_srcs, len(src_c2w_centers))
+
+        def select_sources(center_target: torch.Tensor, extra_index: torch.Tensor):
+            centers_source = src_c2w_centers.index_select(1, extra_index)[:, 0]  # N, 3
+            sims = 1 / (centers_source - center_target).norm(dim=-1).clip(1e-10)  # N,
+            src_inds = sims.topk(n_srcs)[1]  # S, no need for a full sort
+            src_ixts, src_exts = src_cams.index_select(0, extra_index)[0].index_select(0, src_inds).split([9, 16], dim=-1)  # S, 9; S, 16
+            return src_inds, src_ixts.reshape(-1, 3, 3), src_exts.reshape(-1, 4, 4)
+
+        example = (src_c2w_centers.new_zeros(3), torch.zeros(1, dtype=torch.long, device=src_c2w_centers.device))
+        return torch.jit.trace(select_sources, example, check_trace=False)
+
     def get_viewer_batch(self, output: dotdict):
         if self.barebone: return VolumetricVideoDataset.get_viewer_batch(self, output)
 
@@ -222,28 +346,25 @@ class ImageBasedDataset(VolumetricVideoDataset):
             target_index = view_index
             extra_index = latent_index
 
-        center_target = c2w[..., 3]  # 3,
-        centers_source = affine_inverse(self.src_exts[:, extra_index])[..., :3, 3]  # N, 3
-
-        sims: torch.Tensor = 1 / (centers_source - center_target).norm(dim=-1).clip(1e-10)  # N,
-        src_sims, src_inds = sims.sort(dim=-1, descending=True)  # S,
-
+        # Source selection is specialized for the number of source views, traced on first use
         n_srcs = self.n_srcs_list[-1]
-        src_sims, src_inds = src_sims[:n_srcs], src_inds[:n_srcs]
+        if self._viewer_fast is None or self._viewer_fast[0] != n_srcs: self._viewer_fast = n_srcs, self.trace_viewer_sources(n_srcs)
+        center_target = c2w[..., 3].to(self.src_c2w_centers.device)  # 3, on the same device as the sources
+        src_inds, src_ixts, src_exts = self._viewer_fast[1](center_target, torch.as_tensor([extra_index], device=center_target.device))  # S,; S, 3, 3; S, 4, 4
 
         # Source camera parameters
         output.t_inds = extra_index  # only for caching the feature extraction results
         output.meta.t_inds = extra_index  # only for caching the feature extraction results
-        output.src_exts = self.src_exts[src_inds, extra_index]  # S, 4, 4 # these two are already selected
-        output.src_ixts = self.src_ixts[src_inds, extra_index]  # S, 3, 3 # these two are already selected
+        output.src_exts = src_exts  # S, 4, 4 # these two are already selected
+        output.src_ixts = src_ixts  # S, 3, 3 # these two are already selected
 
         # Select the source view indices
-        src_inds = self.src_view_inds.gather(-1, src_inds)  # S, -> T, S, L -> T, S, L
+        source_index = [self._src_view_inds[i] for i in src_inds.tolist()]  # S, -> T, S, L -> T, S, L
+        src_inds = torch.tensor(source_index, dtype=torch.long)  # only promote to tensor once
         output.src_inds = src_inds  # as tensors
         output.meta.src_inds = src_inds  # as tensors
 
         # Source images
-        source_index = src_inds.detach().cpu().numpy().tolist()
         if self.closest_using_t:  # selecting closest view along temporal dimension
             latent_index = source_index
             view_index = extra_index
@@ -255,7 +376,7 @@ class ImageBasedDataset(VolumetricVideoDataset):
 
         # Maybe load foreground human prior
         if self.use_objects_priors:
-            output = self.get_objects_priors(output)
+            output = self.get_objects_priors(output, memoize=False)
 
         # Load bounds
         output.bounds = self.get_bounds(latent_index).clone()  # before inplace operation
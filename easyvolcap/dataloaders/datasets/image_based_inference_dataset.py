@@ -1,5 +1,7 @@
 import torch
 from typing import List
+from functools import lru_cache
+from itertools import accumulate
 from easyvolcap.engine import DATASETS
 from easyvolcap.utils.base_utils import dotdict
 from easyvolcap.utils.console_utils import *
@@ -18,8 +20,10 @@ class ImageBasedInferenceDataset(VolumetricVideoInferenceDataset):
                  append_gt_prob: float = 1.0,
                  extra_src_pool: int = 1,
                  supply_decoded: bool = False,
+                 decode_on_gpu: bool = False,  # decode source jpegs with nvjpeg, only usable with `num_workers=0` (no cuda in forked workers)
                  barebone: bool = False,
                  skip_loading_images: bool = False,
+                 src_image_cache_maxsize: int = 0,  # decoded source images shared across targets, 128 1080p images take ~3GB per worker
 
                  #  closest_using_t: bool = False,
                  #  src_view_sample: List[int] = [0, None, 1],  # use these as input source views
@@ -32,18 +36,37 @@ class ImageBasedInferenceDataset(VolumetricVideoInferenceDataset):
         # self.src_view_sample = src_view_sample
         call_from_cfg(super().__init__, kwargs, skip_loading_images=skip_loading_images)  # will have prepared other parts of the dataset (interpolation or orbit)
         if self.src_view_sample != [0, None, 1] and self.view_sample != [0, None, 1]: log(yellow(f'Using `src_view_sample = {self.src_view_sample}` when `view_sample = {self.view_sample}` is not default'))
+        assert not (decode_on_gpu and (self.cache_raw or self.use_depths or self.encode_ext != '.jpg')), "Can only decode jpeg streams on the gpu, set cache_raw and use_depths to False and encode_ext to .jpg"
 
-        # ImageBasedDataset.load_source_params(self)  # no extra dependencies
-        ImageBasedDataset.load_source_indices(self)  # no extra dependencies
         self.n_srcs_list = n_srcs_list
         self.n_srcs_prob = n_srcs_prob
+        self._n_srcs_cum = list(accumulate(n_srcs_prob))  # avoid recomputing cumulative weights in `random.choices`
         self.extra_src_pool = extra_src_pool
         self.append_gt_prob = append_gt_prob  # manually assign values
 
+        # ImageBasedDataset.load_source_params(self)  # no extra dependencies
+        ImageBasedDataset.load_source_indices(self)  # depends on n_srcs_list and extra_src_pool
+
         # src_inps will come in as decoded bytes instead of jpegs
         self.supply_decoded = supply_decoded
+        self.decode_on_gpu = decode_on_gpu
         self.barebone = barebone
 
+        # Persistent thread pool for loading source views, one thread per possible source image
+        # Created lazily in every process, forked dataloader workers must not reuse the parent's threads
+        self._io_pool = None
+        self._io_pool_pid = None
+
+        # The same source image is loaded for every target that has it among its closest views
+        self.get_source_image = lru_cache(src_image_cache_maxsize)(self.get_image) if src_image_cache_maxsize else self.get_image
+
+        # Traced viewer source selection, keyed by the number of source views
+        self._viewer_fast = None
+
+        # Only metadata is served here, thus no target image to decode ahead of time
+        self.prefetch_target = False
+        self._prefetched = None
+
     def load_interpolations(self):
         ImageBasedDataset.load_source_params(self)  # remember things
 
@@ -78,12 +101,22 @@ class ImageBasedInferenceDataset(VolumetricVideoInferenceDataset):
     def get_objects_bounds(self, latent_index: int):
         return VolumetricVideoDataset.get_objects_bounds(self, latent_index)
 
-    def get_objects_priors(self, output: dotdict):
-        return VolumetricVideoDataset.get_objects_priors(self, output)
+    def get_objects_priors(self, output: dotdict, memoize: bool = True):
+        return VolumetricVideoDataset.get_objects_priors(self, output, memoize)
+
+    def compute_objects_priors(self, *args, **kwargs):
+        return VolumetricVideoDataset.compute_objects_priors(self, *args, **kwargs)
 
     def load_source_params(self):
         return ImageBasedDataset.load_source_params(self)
 
+    @property
+    def io_pool(self):
+        return ImageBasedDataset.io_pool.fget(self)
+
+    def __getstate__(self):
+        return ImageBasedDataset.__getstate__(self)
+
     def __getitem__(self, index: dotdict):
         return ImageBasedDataset.get_metadata(self, index)
 
@@ -108,5 +141,19 @@ class ImageBasedInferenceDataset(VolumetricVideoInferenceDataset):
     def get_viewer_batch(self, batch):
         return ImageBasedDataset.get_viewer_batch(self, batch)
 
+    def trace_viewer_sources(self, *args, **kwargs):
+        return ImageBasedDataset.trace_viewer_sources(self, *args, **kwargs)
+
     def get_sources(self, *args, **kwargs):
         return ImageBasedDataset.get_sources(self, *args, **kwargs)
+
+    def stack_sources(self, *args, **kwargs):
+        return ImageBasedDataset.stack_sources(self, *args, **kwargs)
+
+    @staticmethod
+    def decode_sources(*args, **kwargs):
+        return ImageBasedDataset.decode_sources(*args, **kwargs)
+
+    @staticmethod
+    def batch_sources(*args, **kwargs):
+        return ImageBasedDataset.batch_sources(*args, **kwargs)
@@ -165,6 +165,7 @@ class VolumetricVideoDataset(Dataset):
                  # Unused configs, placed here only to remove warnings
                  barebone: bool = True,  # this is always True here
                  supply_decoded: bool = True,  # this is always True here
+                 decode_on_gpu: bool = False,
                  n_srcs_list: List[int] = [8],
                  n_srcs_prob: List[int] = [1.0],
                  append_gt_prob: float = 0.0,
@@ -307,9 +308,14 @@ class VolumetricVideoDataset(Dataset):
                         self.get_image(v, l)
                         pbar.update()
 
+        # Objects priors are deterministic given the latent index and the target camera, and they recur across epochs
+        # Cleared whenever `vhull_bounds` is assigned or deleted, see the property below
+        self.compute_objects_priors = lru_cache(4096)(self.compute_objects_priors)
+
         # Maybe used in other places
         self.barebone = barebone
         self.supply_decoded = supply_decoded
+        self.decode_on_gpu = decode_on_gpu
         self.n_srcs_list = n_srcs_list
         self.n_srcs_prob = n_srcs_prob
         self.append_gt_prob = append_gt_prob
@@ -638,6 +644,7 @@ class VolumetricVideoDataset(Dataset):
         # Everything just for a bounding box...
         self.vhulls = vhulls  # F, N, 3, differnt shape, # MARK: cannot stack this
         self.vhull_bounds = torch.stack(bounds)  # F, 2, 3
+        self._vhull_physical_inds = {self.physical_to_virtual(i): i for i in range(len(self.vhull_bounds))}  # virtual -> physical latent index, invalid ones raise
         if self.print_vhull_bounds:
             log(magenta(f'Individual visual hull bounds of'))
             for i in range(len(self.vhull_bounds)):
@@ -900,6 +907,10 @@ class VolumetricVideoDataset(Dataset):
 
         return rgb, msk, wet, dpt, bkg, norm
 
+    def get_target_image(self, view_index: int, latent_index: int):
+        # Extension point for datasets that load the target image ahead of time
+        return self.get_image(view_index, latent_index)
+
     def get_camera_params(self, view_index, latent_index):
         latent_index = self.virtual_to_physical(latent_index)
         w2c, c2w = self.w2cs[view_index][latent_index], self.c2ws[view_index][latent_index]
@@ -927,18 +938,66 @@ class VolumetricVideoDataset(Dataset):
         smpl_Th = self.smpl_motions.Th[latent_index]
         return smpl_poses, smpl_shapes, smpl_Rh, smpl_Th
 
+    @property
+    def vhull_bounds(self):
+        return self._vhull_bounds
+
+    @vhull_bounds.setter
+    def vhull_bounds(self, value):
+        # Samplers might replace the bounds with tighter ones after loading, memoized priors would be stale
+        # NOTE: inplace updates (`dataset.vhull_bounds[i] = ...`) are not tracked, call `clear_objects_priors` after them
+        self._vhull_bounds = value
+        self.clear_objects_priors()
+
+    @vhull_bounds.deleter
+    def vhull_bounds(self):
+        del self._vhull_bounds
+        self.clear_objects_priors()
+
+    def clear_objects_priors(self):
+        if hasattr(self.compute_objects_priors, 'cache_clear'): self.compute_objects_priors.cache_clear()  # not yet memoized during `__init__`
+
+    def __getstate__(self):
+        # lru_cache wrappers of bound methods cannot be pickled (spawned dataloader workers), wrap them again after unpickling
+        state, lru_cached = self.__dict__.copy(), {}
+        for k, v in self.__dict__.items():
+            maxsizes = []  # outermost first
+            while hasattr(v, 'cache_clear') and hasattr(v, '__wrapped__'): maxsizes.append(v.cache_info().maxsize); v = v.__wrapped__
+            if maxsizes: state[k], lru_cached[k] = v, maxsizes  # store the plain bound method
+        state['_lru_cached'] = lru_cached
+        return state
+
+    def __setstate__(self, state):
+        lru_cached = state.pop('_lru_cached', {})
+        self.__dict__.update(state)
+        for k, maxsizes in lru_cached.items():
+            for maxsize in reversed(maxsizes): setattr(self, k, lru_cache(maxsize)(getattr(self, k)))
+
     def get_objects_bounds(self, latent_index):
-        latent_index = self.virtual_to_physical(latent_index)
-        if self.use_vhulls: bounds = self.vhull_bounds[latent_index]  # 2, 3
+        if self.use_vhulls: bounds = self.vhull_bounds[self._vhull_physical_inds[int(latent_index)]]  # 2, 3, `vhull_bounds` might be replaced by samplers
         # TODO: check the current SMPL prior implementation, it seems there's no SMPL bounds for now
         elif self.use_smpls: raise NotImplementedError(f'No SMPL bounds for now')
         elif self.objects_bounds is not None: bounds = torch.as_tensor(self.objects_bounds, dtype=torch.float)  # 2, 3
         else: raise NotImplementedError(f'You must provide either vhulls or smpls or objects_bounds')
         return bounds
 
-    def get_objects_priors(self, output: dotdict):
+    def get_objects_priors(self, output: dotdict, memoize: bool = True):
         latent_index = output.meta.latent_index
         H, W, K, R, T = output.H, output.W, output.K, output.R, output.T
+        H, W = int(H), int(W)
+
+        # Memoized on the values of the camera parameters (hashable tuples)
+        # Viewer cameras change every frame and would only pollute the cache, thus computed directly
+        if memoize: meta = self.compute_objects_priors(int(latent_index), H, W, tuple(K.reshape(-1).tolist()), tuple(R.reshape(-1).tolist()), tuple(T.reshape(-1).tolist()))
+        else: meta = getattr(self.compute_objects_priors, '__wrapped__', self.compute_objects_priors)(int(latent_index), H, W, K, R, T)
+
+        # Actually store updated items
+        output.update(meta)
+        output.meta.update(meta)
+        return output
+
+    def compute_objects_priors(self, latent_index: int, H: int, W: int, K: tuple, R: tuple, T: tuple):
+        K, R, T = torch.as_tensor(K).reshape(3, 3), torch.as_tensor(R).reshape(3, 3), torch.as_tensor(T).reshape(3, 1)  # tuples when memoized
 
         # TODO: add vhulls or SMPL prior for multiple object priors supporting
         bounds = self.get_objects_bounds(latent_index)
@@ -946,13 +1005,13 @@ class VolumetricVideoDataset(Dataset):
 
         # Make the height and width of the bounding box to multiply of 32
         # Adjust the x and y coordinates of the bounding box to make it centered and do not exceed the image size
-        H, W = H if isinstance(H, int) else H.item(), W if isinstance(W, int) else W.item()
-        x, y, w_orig, h_orig = x.item(), y.item(), w.item(), h.item()
+        x, y, w_orig, h_orig = map(int, torch.stack([x, y, w, h]).tolist())  # single conversion instead of four `.item()`
         # Default use `ceil()`, but this may cause h > H at low-resolution, so we use `floor()` instead
-        w, h = np.ceil(w_orig / 32) * 32, np.ceil(h_orig / 32) * 32
-        if w > W or h > H: w, h = np.floor(w_orig / 32) * 32, np.floor(h_orig / 32) * 32
-        x, y = np.clip([x - (w - w_orig) // 2, y - (h - h_orig) // 2], 0, [W - w, H - h])
-        x, y, w, h = int(x), int(y), int(w), int(h)
+        # Plain python integer arithmetic, numpy scalar calls are much slower for this
+        w, h = -(-w_orig // 32) * 32, -(-h_orig // 32) * 32
+        if w > W or h > H: w, h = (w_orig // 32) * 32, (h_orig // 32) * 32
+        x = min(max(x - (w - w_orig) // 2, 0), W - w)
+        y = min(max(y - (h - h_orig) // 2, 0), H - h)
 
         # Get the near and far depth of the 3d bounding box
         near, far = get_bound_3d_near_far(bounds, R, T)
@@ -969,11 +1028,7 @@ class VolumetricVideoDataset(Dataset):
         meta.objects_f = torch.tensor(objects_f, dtype=torch.float)  # (Nf,)
         # Overwrite background bounding box to the default large one
         meta.bounds = self.bounds
-
-        # Actually store updated items
-        output.update(meta)
-        output.meta.update(meta)
-        return output
+        return meta  # cached, should not be modified inplace
 
     @property
     def n_views(self): return len(self.cameras)
@@ -1132,7 +1187,7 @@ class VolumetricVideoDataset(Dataset):
     def get_ground_truth(self, index):
         # Load actual images, mask, sampling weights
         output = self.get_metadata(index)
-        rgb, msk, wet, dpt, bkg, norm = self.get_image(output.view_index, output.latent_index)  # H, W, 3
+        rgb, msk, wet, dpt, bkg, norm = self.get_target_image(output.view_index, output.latent_index)  # H, W, 3
         H, W = rgb.shape[:2]
 
         # Maybe crop images
@@ -1367,7 +1422,7 @@ class VolumetricVideoDataset(Dataset):
             output = self.crop_ixts_bounds(output)
 
         if self.use_objects_priors:
-            output = self.get_objects_priors(output)
+            output = self.get_objects_priors(output, memoize=False)
 
         output = self.scale_ixts(output, self.render_ratio)
 
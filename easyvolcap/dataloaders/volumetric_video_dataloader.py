@@ -96,6 +96,11 @@ class VolumetricVideoDataloader(DataLoader):
         batch_sampler: BatchSampler = DATASAMPLERS.build(batch_sampler_cfg, sampler=sampler)  # exposing config, not the best practice?
         if max_iter != -1: batch_sampler = IterationBasedBatchSampler(batch_sampler, max_iter)
 
+        # Sources decoded by nvjpeg are already on the gpu, which cannot be pinned nor created in forked workers
+        if getattr(dataset, 'decode_on_gpu', False):
+            if num_workers: log(yellow(f'Using `num_workers = 0` instead of {num_workers} since `decode_on_gpu` is set'))
+            num_workers, pin_memory = 0, False
+
         # GUI related special config
         if benchmark == 'train': benchmark = args.type == 'train'  # for static sized input
 
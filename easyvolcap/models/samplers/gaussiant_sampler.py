@@ -374,6 +374,7 @@ class GaussianTSampler(PointPlanesSampler):
         for i in range(len(self.pcds)):
             if self.pcds[i] is not None:
                 dataset.vhull_bounds[i] = get_bounds(self.pcds[i].get_xyz[None], padding=0.01)[0].cpu()  # MARK: SYNC
+        if hasattr(dataset, 'clear_objects_priors'): dataset.clear_objects_priors()  # inplace updates bypass the `vhull_bounds` setter
 
     def forward(self, batch: dotdict):
         # Initialization & densification & pruning
@@ -341,6 +341,7 @@ class SuperChargedR4DV(R4DVSampler):
         for i in range(len(self.pcds)):
             if self.pcds[i] is not None:
                 dataset.vhull_bounds[i] = get_bounds(self.pcds[i][None], padding=0.01)[0].cpu()  # MARK: SYNC
+        if hasattr(dataset, 'clear_objects_priors'): dataset.clear_objects_priors()  # inplace updates bypass the `vhull_bounds` setter
 
         l_forward_for_pcd_feat = partial(forward_for_pcd_feat, sampler=self, **kwargs)
         l_forward_for_xyz_feat = partial(forward_for_xyz_feat, sampler=self, **kwargs)
@@ -16,7 +16,14 @@ from easyvolcap.utils.data_utils import get_rays, get_near_far
 from easyvolcap.utils.math_utils import affine_inverse, affine_padding
 
 
-def compute_camera_similarity(tar_c2ws: torch.Tensor, src_c2ws: torch.Tensor):
+def compute_center_distance(centers_target: torch.Tensor, centers_source: torch.Tensor):
+    # Pairwise distance without materializing the (Vt, Vs, F, 3) broadcasted difference
+    # Not using the matmul formulation since it is inexact for coincident centers (target view among the sources)
+    dists = torch.cdist(centers_target.movedim(0, -2), centers_source.movedim(0, -2), compute_mode='donot_use_mm_for_euclid_dist')  # (F, Vt, Vs)
+    return dists.movedim((-2, -1), (0, 1))  # (Vt, Vs, F)
+
+
+def compute_camera_similarity(tar_c2ws: torch.Tensor, src_c2ws: torch.Tensor, top_k: int = None):
     # c2ws = affine_inverse(w2cs)  # N, L, 3, 4
     # src_exts = affine_padding(w2cs)  # N, L, 4, 4
 
@@ -26,10 +33,11 @@ def compute_camera_similarity(tar_c2ws: torch.Tensor, src_c2ws: torch.Tensor):
     centers_source = src_c2ws[..., :3, 3]  # N, L, 3
 
     # Using distance between centers for camera selection
-    sims: torch.Tensor = 1 / (centers_source[None] - centers_target[:, None]).norm(dim=-1)  # N, N, L,
+    sims: torch.Tensor = 1 / compute_center_distance(centers_target, centers_source)  # N, N, L,
 
     # Source view index and there similarity
-    src_sims, src_inds = sims.sort(dim=1, descending=True)  # similarity to source views # Target, Source, Latent
+    if top_k is not None: src_sims, src_inds = sims.topk(min(top_k, sims.shape[1]), dim=1)  # only the closest few are needed # Target, K, Latent
+    else: src_sims, src_inds = sims.sort(dim=1, descending=True)  # similarity to source views # Target, Source, Latent
     return src_sims, src_inds  # N, N, L
 
 
@@ -39,7 +47,7 @@ def compute_camera_zigzag_similarity(tar_c2ws: torch.Tensor, src_c2ws: torch.Ten
     centers_source = src_c2ws[..., :3, 3]  # (Vs, F, 3)
 
     # Compute the distance between the centers
-    sims: torch.Tensor = 1 / (centers_source[None] - centers_target[:, None]).norm(dim=-1)  # (Vt, Vs, F)
+    sims: torch.Tensor = 1 / compute_center_distance(centers_target, centers_source)  # (Vt, Vs, F)
     # Source view index and there similarity
     src_sims, src_inds = sims.sort(dim=1, descending=True)  # (Vt, Vs, F), (Vt, Vs, F)
 
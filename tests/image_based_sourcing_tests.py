@@ -0,0 +1,100 @@
+import torch
+import numpy as np
+from unittest import mock
+from easyvolcap.utils.test_utils import my_tests
+from easyvolcap.utils.base_utils import dotdict
+from easyvolcap.utils.data_utils import DataSplit
+from easyvolcap.utils.math_utils import affine_inverse
+from easyvolcap.utils.bound_utils import get_bound_2d_bound
+from easyvolcap.utils.cam_utils import compute_center_distance, compute_camera_similarity, Sourcing
+from easyvolcap.dataloaders.datasets.image_based_dataset import ImageBasedDataset
+from easyvolcap.dataloaders.datasets.volumetric_video_dataset import VolumetricVideoDataset
+from easyvolcap.utils.console_utils import *
+
+
+def random_w2cs(n_views: int, n_latents: int):
+    w2cs = torch.eye(4)[:3].expand(n_views, n_latents, 3, 4).clone()  # N, L, 3, 4
+    w2cs[..., 3] = torch.randn(n_views, n_latents, 3)
+    return w2cs
+
+
+def make_ibr_dataset(n_views: int, n_latents: int, n_srcs_list: List[int], extra_src_pool: int, append_gt_prob: float):
+    # Only the parts of the dataset used for source view selection, no images on disk
+    dataset: ImageBasedDataset = ImageBasedDataset.__new__(ImageBasedDataset)
+    dataset.w2cs = random_w2cs(n_views, n_latents)
+    dataset.c2ws = affine_inverse(dataset.w2cs)
+    dataset.Ks = torch.eye(3).expand(n_views, n_latents, 3, 3)
+    dataset.view_inds, dataset.frame_inds = torch.arange(n_views), torch.arange(n_latents)
+    dataset.closest_using_t, dataset.src_view_sample = False, [0, None, 1]
+    dataset.source_type = Sourcing.DISTANCE
+    dataset.n_srcs_list = n_srcs_list if len(n_srcs_list) != 1 or n_srcs_list[0] != 0 else [n_views]
+    dataset.extra_src_pool, dataset.append_gt_prob = extra_src_pool, append_gt_prob
+    dataset.split, dataset.prefetch_target = DataSplit.VAL, False
+    dataset.get_sources = lambda latent_index, view_index, output: output  # no images to load
+    dataset.load_source_params()
+    dataset.load_source_indices()
+    return dataset
+
+
+def get_src_inds(dataset: ImageBasedDataset, view_index: int, latent_index: int):
+    def get_metadata(self, index):
+        return dotdict(view_index=view_index, latent_index=latent_index, w2c=self.w2cs[view_index, latent_index], K=self.Ks[view_index, latent_index], meta=dotdict())
+    with mock.patch.object(VolumetricVideoDataset, 'get_metadata', get_metadata):
+        return dataset.get_metadata(dotdict(index=0, n_srcs=dataset.n_srcs_list[0])).src_inds
+
+
+def test_center_distance_matches_norm():
+    tar, src = torch.randn(7, 3, 3), torch.randn(5, 3, 3)  # Vt, F, 3; Vs, F, 3
+    dists = compute_center_distance(tar, src)
+    assert dists.shape == (7, 5, 3)
+    assert torch.allclose(dists, (tar[:, None] - src[None]).norm(dim=-1), atol=1e-6)
+    assert (compute_center_distance(src, src).diagonal(dim1=0, dim2=1) == 0).all()  # coincident centers are exact
+
+
+def test_camera_similarity_top_k_matches_sort():
+    c2ws = affine_inverse(random_w2cs(12, 4))
+    sims, inds = compute_camera_similarity(c2ws, c2ws)
+    for top_k in [1, 5, 12, 20]:
+        top_sims, top_inds = compute_camera_similarity(c2ws, c2ws, top_k)
+        assert top_inds.shape[1] == min(top_k, 12)
+        assert torch.equal(top_sims, sims[:, :top_k])
+        assert torch.equal(top_inds, inds[:, :top_k])
+
+
+def test_get_metadata_uses_every_view():
+    dataset = make_ibr_dataset(6, 2, [0], extra_src_pool=0, append_gt_prob=1.0)  # validation setting for all views
+    src_inds = get_src_inds(dataset, 2, 1)
+    assert sorted(src_inds.tolist()) == list(range(6))
+    assert src_inds[0] == 2  # the target view itself is the closest
+
+
+def test_get_metadata_truncates_large_pool():
+    dataset = make_ibr_dataset(12, 2, [8], extra_src_pool=16, append_gt_prob=1.0)  # more pool than views
+    for _ in range(16):
+        src_inds = get_src_inds(dataset, 3, 0)
+        assert len(src_inds) == 8 and len(set(src_inds.tolist())) == 8
+
+
+def test_objects_priors_alignment():
+    for _ in range(256):
+        H, W = np.random.randint(32, 512, size=2).tolist()
+        f = np.random.uniform(0.5, 2.0) * max(H, W)
+        K = torch.as_tensor([[f, 0, W / 2], [0, f, H / 2], [0, 0, 1]], dtype=torch.float)
+        R, T = torch.eye(3), torch.as_tensor([[0], [0], [np.random.uniform(4, 6)]], dtype=torch.float)
+        center, extent = torch.randn(3) * 0.5, torch.rand(3) + 0.1
+        bounds = torch.stack([center - extent, center + extent])  # 2, 3
+
+        # Reference: previous numpy implementation
+        x, y, w, h = get_bound_2d_bound(bounds, K, R, T, H, W, pad=0)
+        x, y, w_orig, h_orig = x.item(), y.item(), w.item(), h.item()
+        w, h = np.ceil(w_orig / 32) * 32, np.ceil(h_orig / 32) * 32
+        if w > W or h > H: w, h = np.floor(w_orig / 32) * 32, np.floor(h_orig / 32) * 32
+        x, y = np.clip([x - (w - w_orig) // 2, y - (h - h_orig) // 2], 0, [W - w, H - h])
+
+        stub = dotdict(get_objects_bounds=lambda latent_index: bounds, bounds=bounds)
+        meta = VolumetricVideoDataset.compute_objects_priors(stub, 0, H, W, tuple(K.ravel().tolist()), tuple(R.ravel().tolist()), tuple(T.ravel().tolist()))
+        assert meta.objects_xywh[0].tolist() == [int(x), int(y), int(w), int(h)]
+
+
+if __name__ == '__main__':
+    my_tests(globals())